@@ -1,16 +1,17 @@
 # api/admin.py
+from itertools import islice
 from django.contrib import admin
-from django.utils.html import format_html
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils.html import format_html, format_html_join
 from django.urls import path
 from django.shortcuts import render, redirect, get_object_or_404
 from django import forms
-from .models import Case, Report, DicomSeries, DicomImage, Feedback
+from django.forms.models import BaseInlineFormSet
+from .models import Case, Report, DicomSeries, DicomImage, DicomUploadJob, Feedback
 from .services.dicom_service import DicomService
-import os
-import zipfile
-import tempfile
-import shutil
-from django.core.files.uploadedfile import SimpleUploadedFile
+from .tasks import process_dicom_zip
+
 
 # Custom form for creating a case with DICOM files
 class CaseWithDicomForm(forms.ModelForm):
@@ -25,14 +26,31 @@ class CaseWithDicomForm(forms.ModelForm):
         fields = ['title', 'description', 'modality', 'subspecialty', 'difficulty', 'teaching_points']
 
 
+class DicomSeriesInlineFormSet(BaseInlineFormSet):
+    """
+    Only shows the first max_num series of a case, so cases with hundreds of
+    series don't render hundreds of inline forms. The rest are on the
+    DICOM Series changelist.
+    """
+    def get_queryset(self):
+        if not hasattr(self, '_limited_queryset'):
+            self._limited_queryset = super().get_queryset()[:self.max_num]
+        return self._limited_queryset
+
+
 class DicomSeriesInline(admin.TabularInline):
     model = DicomSeries
+    formset = DicomSeriesInlineFormSet
     extra = 0
+    max_num = 20
     fields = ('series_instance_uid', 'series_number', 'description', 'modality', 'get_image_count')
     readonly_fields = ('series_instance_uid', 'get_image_count')
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_image_count=Count('images'))
+    
     def get_image_count(self, obj):
-        return obj.images.count()
+        return obj._image_count
     get_image_count.short_description = 'Images'
 
 
@@ -58,14 +76,21 @@ class CaseAdmin(admin.ModelAdmin):
         ]
         return custom_urls + urls
     
+    def get_queryset(self, request):
+        # Resolve has_dicom_data for every row in the changelist query itself
+        return super().get_queryset(request).annotate(
+            _has_dicom=Exists(DicomSeries.objects.filter(case=OuterRef('pk')))
+        )
+    
     def has_dicom_data(self, obj):
-        has_data = obj.series.exists()
+        has_data = obj._has_dicom
         return format_html(
             '<span style="color: {};">{}</span>',
             'green' if has_data else 'red',
             'Yes' if has_data else 'No'
         )
     has_dicom_data.short_description = 'DICOM Data'
+    has_dicom_data.admin_order_field = '_has_dicom'
     
     def save_model(self, request, obj, form, change):
         """
@@ -76,51 +101,31 @@ class CaseAdmin(admin.ModelAdmin):
         
         # Check if DICOM files were uploaded
         if 'dicom_zip' in form.files:
-            zip_file = form.files['dicom_zip']
-            
-            # Process the ZIP file
-            try:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    # Save the zip file
-                    zip_path = os.path.join(temp_dir, 'dicom.zip')
-                    with open(zip_path, 'wb') as f:
-                        for chunk in zip_file.chunks():
-                            f.write(chunk)
-                    
-                    # Extract the zip
-                    extract_dir = os.path.join(temp_dir, 'extracted')
-                    os.makedirs(extract_dir, exist_ok=True)
-                    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                        zip_ref.extractall(extract_dir)
-                    
-                    # Find all DICOM files
-                    dicom_files = []
-                    for root, dirs, files in os.walk(extract_dir):
-                        for file in files:
-                            if file.lower().endswith(('.dcm', '.dicom')) or '.' not in file:
-                                file_path = os.path.join(root, file)
-                                with open(file_path, 'rb') as f:
-                                    file_content = f.read()
-                                    uploaded_file = SimpleUploadedFile(
-                                        name=file,
-                                        content=file_content,
-                                        content_type='application/dicom'
-                                    )
-                                    dicom_files.append(uploaded_file)
-                    
-                    # Process the DICOM files
-                    stats = DicomService.process_dicom_files(obj.id, dicom_files)
-                
-                self.message_user(
-                    request,
-                    f"Successfully processed {stats['processed_files']} DICOM files. Created {stats['series_created']} series and {stats['images_created']} images."
-                )
-            except Exception as e:
-                self.message_user(
-                    request,
-                    f"Error processing DICOM files: {str(e)}",
-                    level='ERROR'
-                )
+            self.queue_dicom_zip(request, obj.id, form.files['dicom_zip'])
+    
+    def queue_dicom_zip(self, request, case_id, zip_file):
+        """
+        Hand an uploaded DICOM ZIP to the background worker. Returns False if
+        the upload could not be saved.
+        """
+        try:
+            zip_path = DicomService.save_incoming_upload(zip_file)
+            # The admin saves a new case inside a transaction; don't let a
+            # worker (or an eager task) process the ZIP before it's committed
+            transaction.on_commit(lambda: process_dicom_zip.delay(case_id, zip_path))
+
+            self.message_user(
+                request,
+                "DICOM ZIP received and queued for processing. Series and images will appear once processing finishes."
+            )
+            return True
+        except Exception as e:
+            self.message_user(
+                request,
+                f"Error saving DICOM ZIP: {str(e)}",
+                level='ERROR'
+            )
+            return False
     
     def upload_dicom_view(self, request, case_id):
         """
@@ -137,52 +142,8 @@ class CaseAdmin(admin.ModelAdmin):
         if request.method == 'POST':
             form = DicomZipUploadForm(request.POST, request.FILES)
             if form.is_valid():
-                zip_file = request.FILES['dicom_zip']
-                
-                # Process the ZIP file
-                try:
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        # Save the zip file
-                        zip_path = os.path.join(temp_dir, 'dicom.zip')
-                        with open(zip_path, 'wb') as f:
-                            for chunk in zip_file.chunks():
-                                f.write(chunk)
-                        
-                        # Extract the zip
-                        extract_dir = os.path.join(temp_dir, 'extracted')
-                        os.makedirs(extract_dir, exist_ok=True)
-                        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                            zip_ref.extractall(extract_dir)
-                        
-                        # Find all DICOM files
-                        dicom_files = []
-                        for root, dirs, files in os.walk(extract_dir):
-                            for file in files:
-                                if file.lower().endswith(('.dcm', '.dicom')) or '.' not in file:
-                                    file_path = os.path.join(root, file)
-                                    with open(file_path, 'rb') as f:
-                                        file_content = f.read()
-                                        uploaded_file = SimpleUploadedFile(
-                                            name=file,
-                                            content=file_content,
-                                            content_type='application/dicom'
-                                        )
-                                        dicom_files.append(uploaded_file)
-                        
-                        # Process the DICOM files
-                        stats = DicomService.process_dicom_files(case_id, dicom_files)
-                    
-                    self.message_user(
-                        request,
-                        f"Successfully processed {stats['processed_files']} DICOM files. Created {stats['series_created']} series and {stats['images_created']} images."
-                    )
+                if self.queue_dicom_zip(request, case_id, request.FILES['dicom_zip']):
                     return redirect('admin:api_case_change', case_id)
-                except Exception as e:
-                    self.message_user(
-                        request,
-                        f"Error processing DICOM files: {str(e)}",
-                        level='ERROR'
-                    )
         else:
             form = DicomZipUploadForm()
         
@@ -205,6 +166,7 @@ class ReportAdmin(admin.ModelAdmin):
     list_filter = ('language', 'author', 'case__subspecialty', 'status')
     search_fields = ('content', 'author__username', 'case__title')
     readonly_fields = ('creation_date', 'last_modified')
+    list_select_related = ('case', 'author')
 
     def case_title(self, obj):
         return obj.case.title
@@ -216,9 +178,13 @@ class DicomSeriesAdmin(admin.ModelAdmin):
     list_display = ('id', 'case', 'series_instance_uid', 'series_number', 'description', 'modality', 'image_count')
     list_filter = ('modality', 'case')
     search_fields = ('series_instance_uid', 'description', 'case__title')
+    list_select_related = ('case',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_image_count=Count('images'))
     
     def image_count(self, obj):
-        return obj.images.count()
+        return obj._image_count
     image_count.short_description = 'Images'
 
 
@@ -228,17 +194,22 @@ class DicomImageAdmin(admin.ModelAdmin):
     list_filter = ('series__modality', 'series__case')
     search_fields = ('sop_instance_uid', 'series__series_instance_uid', 'series__case__title')
     readonly_fields = ('file_path', 'metadata_display')
+    list_select_related = ('series',)
+    
+    # Only this many metadata entries are rendered on the change page
+    metadata_display_limit = 100
     
     def metadata_display(self, obj):
         if not obj.metadata:
             return "No metadata available"
         
-        html = "<table>"
-        for key, value in obj.metadata.items():
-            html += f"<tr><th>{key}</th><td>{value}</td></tr>"
-        html += "</table>"
-        
-        return format_html(html)
+        # format_html_join escapes the (file-supplied) keys and values
+        rows = format_html_join(
+            '',
+            '<tr><th>{}</th><td>{}</td></tr>',
+            islice(obj.metadata.items(), self.metadata_display_limit)
+        )
+        return format_html('<table>{}</table>', rows)
     metadata_display.short_description = 'Metadata'
 
 
@@ -247,7 +218,15 @@ class FeedbackAdmin(admin.ModelAdmin):
     list_display = ('id', 'report_info', 'generated_date', 'flagged')
     list_filter = ('flagged', 'generated_date')
     search_fields = ('content', 'report__author__username', 'report__case__title')
+    list_select_related = ('report__author',)
     
     def report_info(self, obj):
         return f"Feedback for report {obj.report.id} by {obj.report.author.username}"
-    report_info.short_description = 'Report Info'
\ No newline at end of file
+    report_info.short_description = 'Report Info'
+
+@admin.register(DicomUploadJob)
+class DicomUploadJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'case', 'status', 'completed_chunks', 'total_chunks', 'images_created', 'error_files', 'date_created')
+    list_filter = ('status',)
+    readonly_fields = ('date_created', 'date_completed')
+    list_select_related = ('case',)
@@ -1,6 +1,19 @@
+import os
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Registers the cache invalidation receivers
+        from . import signals  # noqa: F401
+        
+        # Convenience for development; deployments create these up front,
+        # and DicomService creates its directories on first use anyway
+        if settings.DEBUG:
+            os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+            os.makedirs(settings.DICOM_STORAGE_PATH, exist_ok=True)
@@ -0,0 +1,29 @@
+# api/authentication.py
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+
+# Seconds an authenticated token is trusted without checking the database
+AUTH_TOKEN_CACHE_TIMEOUT = 60
+
+
+def token_cache_key(key):
+    return f"auth:token:{key}"
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps the token and its user in the cache, so
+    most requests authenticate without a database query.
+    
+    Deleting a token (logout) or saving its user drops the cached entry;
+    see api/signals.py.
+    """
+    
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is None:
+            # Raises AuthenticationFailed for unknown tokens and inactive users
+            credentials = super().authenticate_credentials(key)
+            cache.set(cache_key, credentials, AUTH_TOKEN_CACHE_TIMEOUT)
+        return credentials
@@ -0,0 +1,53 @@
+# api/cache.py
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+# Bumped whenever case/DICOM data changes; every cached response key includes
+# it, so one write invalidates all of them on any cache backend
+RESPONSE_CACHE_VERSION_KEY = 'api:response-cache-version'
+
+# Cached responses expire after this many seconds even without a change
+RESPONSE_CACHE_TIMEOUT = 300
+
+
+def _response_cache_version():
+    version = cache.get(RESPONSE_CACHE_VERSION_KEY)
+    if version is None:
+        # A timestamp rather than 1, so an evicted version key never brings
+        # back responses cached under an older version
+        cache.add(RESPONSE_CACHE_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(RESPONSE_CACHE_VERSION_KEY)
+    return version
+
+
+def invalidate_response_cache():
+    """Expire every response cached by cache_response"""
+    cache.set(RESPONSE_CACHE_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def cache_response(method):
+    """
+    Cache the data of a successful viewset response.
+
+    Responses are keyed by the full URL (host included, since file URLs are
+    absolute) and whether the user is staff, and are dropped by
+    invalidate_response_cache when the underlying data changes.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f"api:response:{_response_cache_version()}:{self.basename}:{self.action}:{url}:{request.user.is_staff}"
+
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, RESPONSE_CACHE_TIMEOUT)
+        return response
+    return wrapper
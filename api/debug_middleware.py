@@ -1,16 +1,42 @@
 # api/debug_middleware.py
 
-import json
 import logging
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.utils.deprecation import MiddlewareMixin
 
 logger = logging.getLogger(__name__)
 
+# Response bodies larger than this are not decoded or logged
+MAX_LOGGED_CONTENT_LENGTH = 4096
+
+# Request bodies larger than this are not read or logged
+MAX_LOGGED_BODY_LENGTH = 2048
+
+class LazyHeaders:
+    """
+    Wraps request.META so the HTTP headers are only collected if the log
+    record is actually formatted.
+    """
+    
+    def __init__(self, request):
+        self.request = request
+    
+    def __str__(self):
+        return str({k: v for k, v in self.request.META.items() if k.startswith('HTTP_')})
+
 class DebugRequestMiddleware(MiddlewareMixin):
     """
     Middleware to log detailed request information for debugging.
+    Only active when DEBUG is on and the logger emits INFO records.
     """
     
+    def __init__(self, get_response):
+        # Drop out of the middleware chain entirely when nothing would be logged
+        if not settings.DEBUG or not logger.isEnabledFor(logging.INFO):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+    
     def process_request(self, request):
         if request.path.startswith('/api/'):
             logger.info(f"\n{'=' * 50}")
@@ -20,22 +46,32 @@ class DebugRequestMiddleware(MiddlewareMixin):
             logger.info(f"META: {request.META.get('REMOTE_ADDR')}, {request.META.get('HTTP_USER_AGENT')}")
             
             # Log request headers
-            headers = {k: v for k, v in request.META.items() if k.startswith('HTTP_')}
-            logger.info(f"HEADERS: {headers}")
+            logger.info("HEADERS: %s", LazyHeaders(request))
             
             # Log request body for POST, PUT, PATCH
             if request.method in ['POST', 'PUT', 'PATCH']:
+                content_type = request.content_type or ''
+                if 'multipart/form-data' in content_type:
+                    # Reading the body here would buffer the whole upload in memory
+                    logger.info("REQUEST BODY: <multipart upload, not logged>")
+                    return None
                 try:
-                    if request.content_type and 'application/json' in request.content_type:
-                        body = json.loads(request.body.decode('utf-8')) if request.body else {}
-                        logger.info(f"REQUEST BODY (JSON): {json.dumps(body, indent=2)}")
+                    content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+                except ValueError:
+                    content_length = 0
+                if content_length > MAX_LOGGED_BODY_LENGTH:
+                    # Same for any other large body, e.g. a raw ZIP or DICOM POST
+                    logger.info(f"REQUEST BODY: <{content_length} bytes, not logged>")
+                    return None
+                try:
+                    body = request.body
+                    if 'application/json' in content_type:
+                        logger.info(f"REQUEST BODY (JSON): {body.decode('utf-8', errors='replace')}")
                     else:
-                        logger.info(f"REQUEST BODY (RAW): {request.body}")
+                        logger.info(f"REQUEST BODY (RAW): {body}")
                         logger.info(f"POST DATA: {request.POST}")
-                        logger.info(f"FILES: {request.FILES}")
                 except Exception as e:
-                    logger.info(f"Could not parse request body: {e}")
-                    logger.info(f"REQUEST BODY RAW: {request.body}")
+                    logger.info(f"Could not read request body: {e}")
             
         return None
     
@@ -43,21 +79,15 @@ class DebugRequestMiddleware(MiddlewareMixin):
         if request.path.startswith('/api/'):
             logger.info(f"RESPONSE STATUS: {response.status_code}")
             
-            # Log response content
-            if hasattr(response, 'content'):
+            # Log response content, skipping streamed and large bodies
+            if response.streaming:
+                logger.info("RESPONSE CONTENT: <streaming response>")
+            elif len(response.content) > MAX_LOGGED_CONTENT_LENGTH:
+                logger.info(f"RESPONSE CONTENT: <{len(response.content)} bytes, not logged>")
+            else:
                 try:
-                    content = response.content.decode('utf-8')
-                    if response['Content-Type'] and 'application/json' in response['Content-Type']:
-                        try:
-                            content_json = json.loads(content)
-                            logger.info(f"RESPONSE CONTENT (JSON): {json.dumps(content_json, indent=2)}")
-                        except:
-                            logger.info(f"RESPONSE CONTENT: {content}")
-                    else:
-                        if len(content) > 1000:
-                            logger.info(f"RESPONSE CONTENT (truncated): {content[:1000]}...")
-                        else:
-                            logger.info(f"RESPONSE CONTENT: {content}")
+                    # JSON bodies are logged as-is rather than parsed and re-dumped
+                    logger.info(f"RESPONSE CONTENT: {response.content.decode('utf-8')}")
                 except Exception as e:
                     logger.info(f"Could not decode response content: {e}")
             
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-15 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_case_dicom_path_case_teaching_points_report_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='case',
+            name='difficulty',
+            field=models.CharField(blank=True, choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], db_index=True, help_text='Case difficulty level', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='case',
+            name='modality',
+            field=models.CharField(blank=True, choices=[('xr', 'X-Ray'), ('ct', 'CT'), ('mri', 'MRI'), ('us', 'Ultrasound'), ('nm', 'Nuclear Medicine'), ('fluoro', 'Fluoroscopy'), ('angio', 'Angiography/Interventional')], db_index=True, help_text='Imaging modality used', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='case',
+            name='subspecialty',
+            field=models.CharField(blank=True, choices=[('neuro', 'Neuro'), ('msk', 'MSK'), ('body', 'Body'), ('chest', 'Chest'), ('hn', 'Head & Neck'), ('nucmed', 'Nuclear Medicine'), ('peds', 'General Pediatrics'), ('ir', 'Interventional')], db_index=True, help_text='Radiology subspecialty area', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='dicomimage',
+            name='instance_number',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='dicomseries',
+            name='series_number',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='content',
+            field=models.TextField(blank=True, default='', help_text="The user's diagnostic report text"),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='language',
+            field=models.CharField(db_index=True, default='en', help_text="Language code (e.g., 'en', 'es', 'fr')", max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('submitted', 'Submitted for Feedback'), ('feedback_ready', 'Feedback Ready')], db_index=True, default='draft', help_text='Current status of the report', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='dicomseries',
+            index=models.Index(fields=['case', 'series_number'], name='api_dicomse_case_id_69bc19_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-15 20:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_add_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DicomUploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('total_chunks', models.PositiveIntegerField(default=0)),
+                ('completed_chunks', models.PositiveIntegerField(default=0)),
+                ('total_files', models.PositiveIntegerField(default=0)),
+                ('processed_files', models.PositiveIntegerField(default=0)),
+                ('skipped_files', models.PositiveIntegerField(default=0)),
+                ('error_files', models.PositiveIntegerField(default=0)),
+                ('series_created', models.PositiveIntegerField(default=0)),
+                ('images_created', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_completed', models.DateTimeField(blank=True, null=True)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dicom_upload_jobs', to='api.case')),
+            ],
+        ),
+    ]
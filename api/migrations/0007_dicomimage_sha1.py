@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_dicomuploadjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dicomimage',
+            name='sha1',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_dicomimage_sha1'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dicomimage',
+            index=models.Index(fields=['series', 'instance_number'], name='api_dicomim_series__4bcbc2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['author', '-creation_date'], name='api_report_author__64e6f2_idx'),
+        ),
+    ]
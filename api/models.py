@@ -10,50 +10,53 @@ class Case(models.Model):
     description = models.TextField(help_text="Detailed clinical history and findings (anonymized)")
 
     # --- MODALITY FIELD ---
-    MODALITY_CHOICES = [
-        ('xr', 'X-Ray'),
-        ('ct', 'CT'),
-        ('mri', 'MRI'),
-        ('us', 'Ultrasound'),
-        ('nm', 'Nuclear Medicine'),
-        ('fluoro', 'Fluoroscopy'),
-        ('angio', 'Angiography/Interventional'),
+    class Modality(models.TextChoices):
+        XR = 'xr', 'X-Ray'
+        CT = 'ct', 'CT'
+        MRI = 'mri', 'MRI'
+        US = 'us', 'Ultrasound'
+        NM = 'nm', 'Nuclear Medicine'
+        FLUORO = 'fluoro', 'Fluoroscopy'
+        ANGIO = 'angio', 'Angiography/Interventional'
         # Add more as needed
-    ]
+
     modality = models.CharField(
         max_length=10,
-        choices=MODALITY_CHOICES,
+        choices=Modality.choices,
         blank=True, # Make it optional if needed
+        db_index=True,
         help_text="Imaging modality used"
     )
 
-    SUBSPECIALTY_CHOICES = [
-        ('neuro', 'Neuro'),
-        ('msk', 'MSK'),
-        ('body', 'Body'),
-        ('chest', 'Chest'),
-        ('hn', 'Head & Neck'),
-        ('nucmed', 'Nuclear Medicine'),
-        ('peds', 'General Pediatrics'),
-        ('ir', 'Interventional'),
+    class Subspecialty(models.TextChoices):
+        NEURO = 'neuro', 'Neuro'
+        MSK = 'msk', 'MSK'
+        BODY = 'body', 'Body'
+        CHEST = 'chest', 'Chest'
+        HN = 'hn', 'Head & Neck'
+        NUCMED = 'nucmed', 'Nuclear Medicine'
+        PEDS = 'peds', 'General Pediatrics'
+        IR = 'ir', 'Interventional'
         # Add more as needed
-    ]
+
     subspecialty = models.CharField(
         max_length=10,
-        choices=SUBSPECIALTY_CHOICES,
+        choices=Subspecialty.choices,
         blank=True,
+        db_index=True,
         help_text="Radiology subspecialty area"
     )
 
-    DIFFICULTY_CHOICES = [
-        ('easy', 'Easy'), 
-        ('medium', 'Medium'), 
-        ('hard', 'Hard')
-    ]
+    class Difficulty(models.TextChoices):
+        EASY = 'easy', 'Easy'
+        MEDIUM = 'medium', 'Medium'
+        HARD = 'hard', 'Hard'
+
     difficulty = models.CharField(
         max_length=50, 
         blank=True, 
-        choices=DIFFICULTY_CHOICES,
+        choices=Difficulty.choices,
+        db_index=True,
         help_text="Case difficulty level"
     )
     
@@ -85,7 +88,7 @@ class Report(models.Model):
     case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='reports') # Link to the Case
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports') # Link to the User who wrote it
     content = models.TextField(help_text="The user's diagnostic report text", blank=True, default='')
-    language = models.CharField(max_length=10, default='en', help_text="Language code (e.g., 'en', 'es', 'fr')")
+    language = models.CharField(max_length=10, default='en', db_index=True, help_text="Language code (e.g., 'en', 'es', 'fr')")
     
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -96,6 +99,7 @@ class Report(models.Model):
         max_length=20, 
         choices=STATUS_CHOICES, 
         default='draft',
+        db_index=True,
         help_text="Current status of the report"
     )
     
@@ -103,6 +107,12 @@ class Report(models.Model):
     last_modified = models.DateTimeField(auto_now=True)
     submission_date = models.DateTimeField(null=True, blank=True, help_text="When the report was submitted for feedback")
 
+    class Meta:
+        indexes = [
+            # Reports are listed per author, newest first
+            models.Index(fields=['author', '-creation_date']),
+        ]
+
     def __str__(self):
         return f"Report by {self.author.username} for Case {self.case.id} ({self.creation_date.strftime('%Y-%m-%d')})"
 
@@ -128,7 +138,7 @@ class DicomSeries(models.Model):
     """
     case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='series')
     series_instance_uid = models.CharField(max_length=255, unique=True)
-    series_number = models.IntegerField(null=True, blank=True)
+    series_number = models.IntegerField(null=True, blank=True, db_index=True)
     description = models.CharField(max_length=255, null=True, blank=True)
     modality = models.CharField(max_length=50, null=True, blank=True)
     date_created = models.DateTimeField(auto_now_add=True)
@@ -136,6 +146,10 @@ class DicomSeries(models.Model):
     class Meta:
         verbose_name_plural = "DICOM Series"
         ordering = ['series_number']
+        indexes = [
+            # Series are listed per case in series order
+            models.Index(fields=['case', 'series_number']),
+        ]
     
     def __str__(self):
         return f"{self.description or 'Unknown'} - {self.series_instance_uid}"
@@ -146,14 +160,19 @@ class DicomImage(models.Model):
     """
     series = models.ForeignKey(DicomSeries, on_delete=models.CASCADE, related_name='images')
     sop_instance_uid = models.CharField(max_length=255, unique=True)
-    instance_number = models.IntegerField(null=True, blank=True)
+    instance_number = models.IntegerField(null=True, blank=True, db_index=True)
     file_path = models.CharField(max_length=500)  # Path to the stored DICOM file
     thumbnail_path = models.CharField(max_length=500, null=True, blank=True)  # Optional path to image thumbnail
     metadata = models.JSONField(null=True, blank=True)  # Store essential metadata as JSON
+    sha1 = models.CharField(max_length=40, blank=True)  # SHA-1 of the stored file, used as its ETag
     date_created = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['instance_number']
+        indexes = [
+            # Images are listed per series in instance order
+            models.Index(fields=['series', 'instance_number']),
+        ]
     
     def __str__(self):
         return f"Image {self.instance_number or 'Unknown'} - {self.sop_instance_uid}"
@@ -161,4 +180,33 @@ class DicomImage(models.Model):
     @property
     def file_url(self):
         """Return the URL to access this DICOM file"""
-        return f"/api/images/{self.id}/file/"
\ No newline at end of file
+        return f"/api/images/{self.id}/file/"
+
+
+class DicomUploadJob(models.Model):
+    """
+    Tracks a DICOM upload that is being processed in the background.
+    The files are processed in chunks; each chunk adds its counts here.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        PROCESSING = 'processing', 'Processing'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+
+    case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='dicom_upload_jobs')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    total_chunks = models.PositiveIntegerField(default=0)
+    completed_chunks = models.PositiveIntegerField(default=0)
+    total_files = models.PositiveIntegerField(default=0)
+    processed_files = models.PositiveIntegerField(default=0)
+    skipped_files = models.PositiveIntegerField(default=0)
+    error_files = models.PositiveIntegerField(default=0)
+    series_created = models.PositiveIntegerField(default=0)
+    images_created = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_completed = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"DICOM upload {self.id} for Case {self.case_id} ({self.status})"
@@ -0,0 +1,13 @@
+# api/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class DicomImagePagination(CursorPagination):
+    """
+    Cursor pagination for DICOM images. A study can hold thousands of images;
+    a cursor keeps every page an indexed range scan where OFFSET would have to
+    skip all the earlier rows.
+    """
+    # instance_number is nullable and not unique, so it can't position a
+    # cursor reliably; the primary key can
+    ordering = 'id'
@@ -0,0 +1,80 @@
+# api/renderers.py
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the json module
+    orjson = None
+
+# Rows fetched, serialized and sent per chunk of a streamed JSON array
+STREAM_CHUNK_SIZE = 500
+
+# Types orjson doesn't encode (Decimal, lazy strings, ...) go through DRF's
+# encoder; so do datetimes, which DRF formats differently from orjson
+_encoder_default = JSONEncoder().default
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+
+def dumps(data):
+    """Encode data as compact UTF-8 JSON bytes, as DRF's JSONRenderer does"""
+    if orjson is not None:
+        ret = orjson.dumps(data, default=_encoder_default, option=_ORJSON_OPTIONS)
+    else:
+        ret = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+    # Like JSONRenderer, escape the line separators that aren't valid in
+    # JavaScript string literals
+    return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson, which is several times faster than
+    the json module on large responses such as DICOM metadata. Indented
+    output (e.g. for the browsable API) is left to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser that decodes request bodies with orjson"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+def stream_json_array(queryset, serialize, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield a JSON array of serialize(obj) for every row of queryset.
+
+    Rows are read with QuerySet.iterator() and encoded a chunk at a time,
+    so neither the model instances nor the encoded response are ever held
+    in memory as a whole.
+    """
+    separator = b'['
+    items = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        items.append(dumps(serialize(obj)))
+        if len(items) == chunk_size:
+            yield separator + b','.join(items)
+            separator = b','
+            items = []
+    if items:
+        yield separator + b','.join(items)
+        separator = b','
+    yield b'[]' if separator == b'[' else b']'
@@ -1,7 +1,13 @@
 # api/serializers.py
 from rest_framework import serializers
+from rest_framework.pagination import PageNumberPagination
 from django.contrib.auth.models import User
-from .models import Case, Report, Feedback, DicomSeries, DicomImage
+from .models import Case, Report, Feedback, DicomSeries, DicomImage, DicomUploadJob
+
+# Choice labels never change at runtime, so build the lookups once
+_MODALITY_MAP = dict(Case.Modality.choices)
+_SUBSPECIALTY_MAP = dict(Case.Subspecialty.choices)
+_DIFFICULTY_MAP = dict(Case.Difficulty.choices)
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -19,9 +25,9 @@ class CaseSerializer(serializers.ModelSerializer):
     Handles converting Case instances to JSON and vice-versa.
     """
     # Display the readable name for choices fields
-    modality_display = serializers.CharField(source='get_modality_display', read_only=True)
-    subspecialty_display = serializers.CharField(source='get_subspecialty_display', read_only=True)
-    difficulty_display = serializers.CharField(source='get_difficulty_display', read_only=True)
+    modality_display = serializers.SerializerMethodField()
+    subspecialty_display = serializers.SerializerMethodField()
+    difficulty_display = serializers.SerializerMethodField()
 
     class Meta:
         model = Case
@@ -44,6 +50,39 @@ class CaseSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['creation_date', 'last_modified'] # Fields that shouldn't be editable via API
 
+    # Same fallback as Model.get_FOO_display: unknown values are shown as-is
+    def get_modality_display(self, obj):
+        return _MODALITY_MAP.get(obj.modality, obj.modality)
+
+    def get_subspecialty_display(self, obj):
+        return _SUBSPECIALTY_MAP.get(obj.subspecialty, obj.subspecialty)
+
+    def get_difficulty_display(self, obj):
+        return _DIFFICULTY_MAP.get(obj.difficulty, obj.difficulty)
+
+
+class CaseListSerializer(CaseSerializer):
+    """
+    Serializer for listing cases.
+    Leaves out teaching points and storage references, which only the
+    single-case view needs.
+    """
+    class Meta(CaseSerializer.Meta):
+        fields = [
+            'id',
+            'title',
+            'description',
+            'modality',
+            'modality_display',
+            'subspecialty',
+            'subspecialty_display',
+            'dicom_path',
+            'difficulty',
+            'difficulty_display',
+            'creation_date',
+            'last_modified',
+        ]
+
 
 class FeedbackSerializer(serializers.ModelSerializer):
     """
@@ -107,6 +146,32 @@ class ReportSerializer(serializers.ModelSerializer):
         return report
 
 
+class ReportListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight serializer for listing reports.
+    Leaves out the report content and the nested case and feedback;
+    fetch a single report for those.
+    """
+    author = UserSerializer(read_only=True)
+    case_id = serializers.IntegerField(read_only=True)
+    case_title = serializers.CharField(source='case.title', read_only=True)
+
+    class Meta:
+        model = Report
+        fields = [
+            'id',
+            'case_id',
+            'case_title',
+            'author',
+            'language',
+            'status',
+            'creation_date',
+            'last_modified',
+            'submission_date',
+        ]
+        read_only_fields = fields
+
+
 class DicomImageSerializer(serializers.ModelSerializer):
     """Serializer for DicomImage model"""
     file_url = serializers.SerializerMethodField()
@@ -124,7 +189,49 @@ class DicomImageSerializer(serializers.ModelSerializer):
         if request is None:
             return obj.file_url
         
-        return request.build_absolute_uri(obj.file_url)
+        # Build the scheme://host prefix once per response, not once per image
+        host = self.context.get('_host')
+        if host is None:
+            host = self.context['_host'] = request.build_absolute_uri('/')[:-1]
+        return f"{host}{obj.file_url}"
+
+
+# DicomImage columns read by DicomImageListSerializer; series_id is kept so
+# the images can still be tied back to their series without another query
+DICOM_IMAGE_LIST_FIELDS = (
+    'id', 'series_id', 'sop_instance_uid', 'instance_number', 'thumbnail_path',
+)
+
+
+class DicomImageListSerializer(DicomImageSerializer):
+    """
+    Serializer for lists of images.
+    Leaves out the metadata blob; fetch it per image from the metadata action.
+    """
+    class Meta(DicomImageSerializer.Meta):
+        fields = [
+            'id', 'sop_instance_uid', 'instance_number',
+            'file_url', 'thumbnail_path'
+        ]
+    
+    def to_representation(self, instance):
+        # Built directly rather than field by field: a series can list
+        # thousands of images, and these fields need no conversion
+        return {
+            'id': instance.id,
+            'sop_instance_uid': instance.sop_instance_uid,
+            'instance_number': instance.instance_number,
+            'file_url': self.get_file_url(instance),
+            'thumbnail_path': instance.thumbnail_path,
+        }
+
+
+# DicomSeries columns read by DicomSeriesSerializer; case_id is kept because
+# case.series reads it to attach the case, which would otherwise be a query
+# per series
+DICOM_SERIES_FIELDS = (
+    'id', 'case_id', 'series_instance_uid', 'series_number', 'description', 'modality',
+)
 
 
 class DicomSeriesSerializer(serializers.ModelSerializer):
@@ -138,14 +245,68 @@ class DicomSeriesSerializer(serializers.ModelSerializer):
             'description', 'modality', 'image_count'
         ]
     
+    def to_representation(self, instance):
+        # Built directly rather than field by field; these fields need no
+        # conversion
+        return {
+            'id': instance.id,
+            'series_instance_uid': instance.series_instance_uid,
+            'series_number': instance.series_number,
+            'description': instance.description,
+            'modality': instance.modality,
+            'image_count': self.get_image_count(instance),
+        }
+    
     def get_image_count(self, obj):
         """Get the number of images in this series"""
-        return obj.images.count()
+        # Viewsets annotate the count up front; fall back to a query otherwise
+        image_count = getattr(obj, '_image_count', None)
+        if image_count is None:
+            image_count = obj.images.count()
+        return image_count
+
+
+class SeriesImagesPagination(PageNumberPagination):
+    """Pagination for the images nested in a series detail response"""
+    page_size = 100
+    page_query_param = 'images_page'
+    page_size_query_param = 'images_page_size'
+    max_page_size = 500
 
 
 class DicomSeriesDetailSerializer(DicomSeriesSerializer):
-    """Detailed serializer for DicomSeries with images"""
-    images = DicomImageSerializer(many=True, read_only=True)
+    """Detailed serializer for DicomSeries with a page of its images"""
+    images = serializers.SerializerMethodField()
     
     class Meta(DicomSeriesSerializer.Meta):
-        fields = DicomSeriesSerializer.Meta.fields + ['images']
\ No newline at end of file
+        fields = DicomSeriesSerializer.Meta.fields + ['images']
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['images'] = self.get_images(instance)
+        return data
+    
+    def get_images(self, obj):
+        """Get one page of this series' images ({count, next, previous, results})"""
+        images = obj.images.only(*DICOM_IMAGE_LIST_FIELDS)
+        request = self.context.get('request')
+        if request is None:
+            return DicomImageListSerializer(images, many=True, context=self.context).data
+        
+        paginator = SeriesImagesPagination()
+        page = paginator.paginate_queryset(images, request)
+        serializer = DicomImageListSerializer(page, many=True, context=self.context)
+        return paginator.get_paginated_response(serializer.data).data
+
+class DicomUploadJobSerializer(serializers.ModelSerializer):
+    """Serializer for DicomUploadJob model (progress of a background upload)"""
+    
+    class Meta:
+        model = DicomUploadJob
+        fields = [
+            'id', 'case', 'status', 'total_chunks', 'completed_chunks',
+            'total_files', 'processed_files', 'skipped_files', 'error_files',
+            'series_created', 'images_created', 'error',
+            'date_created', 'date_completed'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,63 @@
+# api/services/feedback_service.py
+
+import hashlib
+import logging
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Generated feedback is reused for identical reports on a case for a day
+FEEDBACK_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+class FeedbackService:
+    """
+    Service for generating feedback on submitted reports.
+    """
+    
+    @staticmethod
+    def generate_feedback(case_id, content):
+        """
+        Generate feedback for a report on a case.
+        
+        Mock feedback generation - In a real implementation, you would call
+        your LLM API here.
+        """
+        return """
+        # Feedback on Your Report
+        
+        Thank you for submitting your diagnostic report. Here is some feedback to help you improve:
+        
+        ## Key Findings
+        Your report correctly identified most of the important findings. Good job on noting the primary pathology.
+        
+        ## Areas for Improvement
+        Consider including measurements of any abnormalities you observe. Also, be more specific in your description of location.
+        
+        ## Teaching Points
+        This case demonstrates classic features of the pathology. Remember that these findings often appear together and form a recognized pattern.
+        
+        ## Overall Assessment
+        This is a solid report with good structure. Continue to work on being comprehensive yet concise.
+        """
+    
+    @staticmethod
+    def get_feedback(case_id, content):
+        """
+        Return feedback for a report, reusing the feedback already generated
+        for the same text on the same case.
+        
+        Reports that only differ in whitespace share a cache entry, so
+        trainees writing the same report don't each pay for an LLM call.
+        """
+        normalized = ' '.join(content.split())
+        digest = hashlib.sha256(f"{case_id}:{normalized}".encode()).hexdigest()
+        key = f"feedback:{digest}"
+        
+        feedback = cache.get(key)
+        if feedback is None:
+            feedback = FeedbackService.generate_feedback(case_id, content)
+            cache.set(key, feedback, FEEDBACK_CACHE_TIMEOUT)
+        else:
+            logger.debug("Reusing cached feedback for case %s", case_id)
+        return feedback
@@ -0,0 +1,33 @@
+# api/signals.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache_key
+from .cache import invalidate_response_cache
+from .models import Case, DicomSeries
+
+
+# Not connected to DicomImage: a delete receiver would turn off fast deletes
+# of a case's or series' images. Images are only bulk-inserted, by
+# DicomService.process_dicom_files, which invalidates the cache itself.
+@receiver([post_save, post_delete], sender=Case)
+@receiver([post_save, post_delete], sender=DicomSeries)
+def invalidate_cached_responses(sender, **kwargs):
+    """Cached case/series/image responses are stale once a case or series changes"""
+    invalidate_response_cache()
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """A deleted token (e.g. on logout) must stop authenticating right away"""
+    cache.delete(token_cache_key(instance.key))
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_user_tokens(sender, instance, **kwargs):
+    """Cached tokens carry a copy of the user, e.g. its is_staff and is_active flags"""
+    keys = Token.objects.filter(user_id=instance.pk).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
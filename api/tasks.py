@@ -0,0 +1,177 @@
+# api/tasks.py
+import logging
+import os
+from contextlib import ExitStack
+
+from celery import group, shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DicomUploadJob, Feedback, Report
+from .services.dicom_service import DicomService
+from .services.feedback_service import FeedbackService
+
+logger = logging.getLogger(__name__)
+
+# Counters reported by DicomService.process_dicom_files and summed per job
+DICOM_STATS_FIELDS = (
+    'processed_files',
+    'skipped_files',
+    'error_files',
+    'series_created',
+    'images_created',
+)
+
+
+@shared_task
+def process_dicom_zip(case_id, zip_path):
+    """
+    Extract and process the DICOM files in a ZIP archive saved by
+    DicomService.save_incoming_upload, then remove the archive.
+    
+    Returns:
+        dict: Processing statistics from DicomService.process_dicom_files
+    """
+    try:
+        with DicomService.open_dicom_zip(zip_path) as dicom_files:
+            return DicomService.process_dicom_files(case_id, dicom_files)
+    finally:
+        try:
+            os.remove(zip_path)
+        except OSError:
+            logger.warning(f"Could not remove processed upload {zip_path}")
+
+
+def enqueue_dicom_upload(case_id, file_paths):
+    """
+    Create a DicomUploadJob for files saved by
+    DicomService.save_incoming_files and queue one process_dicom_chunk task
+    per DICOM_UPLOAD_CHUNK_SIZE files.
+    
+    Returns:
+        DicomUploadJob: The job tracking the upload
+    """
+    chunk_size = settings.DICOM_UPLOAD_CHUNK_SIZE
+    chunks = [file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size)]
+    
+    job = DicomUploadJob.objects.create(
+        case_id=case_id,
+        total_chunks=len(chunks),
+        total_files=len(file_paths)
+    )
+    
+    def queue_chunks():
+        try:
+            group(process_dicom_chunk.s(job.id, chunk) for chunk in chunks).apply_async()
+        except Exception as e:
+            # No chunk will ever report back, so close the job here
+            DicomUploadJob.objects.filter(pk=job.id).update(
+                status=DicomUploadJob.Status.FAILED,
+                error=str(e),
+                date_completed=timezone.now()
+            )
+            raise
+    
+    # Don't let a worker pick up a job that isn't committed yet
+    transaction.on_commit(queue_chunks)
+    return job
+
+
+@shared_task
+def process_dicom_chunk(job_id, file_paths):
+    """
+    Process one chunk of a DicomUploadJob, add its statistics to the job and
+    remove the processed files. Each chunk commits on its own, so a failed
+    chunk doesn't roll back the rest of the upload.
+    """
+    job = DicomUploadJob.objects.only('case_id').get(pk=job_id)
+    DicomUploadJob.objects.filter(pk=job_id, status=DicomUploadJob.Status.PENDING).update(
+        status=DicomUploadJob.Status.PROCESSING
+    )
+    
+    error = ''
+    try:
+        with ExitStack() as stack:
+            dicom_files = [stack.enter_context(open(path, 'rb')) for path in file_paths]
+            stats = DicomService.process_dicom_files(job.case_id, dicom_files)
+    except Exception as e:
+        logger.exception(f"Error processing DICOM upload job {job_id}")
+        stats = {'error_files': len(file_paths)}
+        error = str(e)
+    finally:
+        for path in file_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                logger.warning(f"Could not remove processed upload {path}")
+        
+        # The last chunk to finish leaves the upload directory empty
+        if file_paths:
+            try:
+                os.rmdir(os.path.dirname(file_paths[0]))
+            except OSError:
+                pass
+    
+    updates = {field: F(field) + stats.get(field, 0) for field in DICOM_STATS_FIELDS}
+    if error:
+        updates['error'] = error
+    DicomUploadJob.objects.filter(pk=job_id).update(
+        completed_chunks=F('completed_chunks') + 1,
+        **updates
+    )
+    
+    # Close the job once every chunk has reported back
+    finished = DicomUploadJob.objects.filter(
+        pk=job_id,
+        completed_chunks=F('total_chunks'),
+        date_completed__isnull=True
+    )
+    finished.filter(error='').update(status=DicomUploadJob.Status.COMPLETED, date_completed=timezone.now())
+    finished.update(status=DicomUploadJob.Status.FAILED, date_completed=timezone.now())
+    
+    return stats
+
+
+@shared_task
+def delete_dicom_directory(path):
+    """
+    Remove a DICOM directory set aside by DicomService.delete_case_dicom_data.
+    """
+    DicomService.remove_directory(path)
+
+
+@shared_task
+def generate_report_feedback(report_id):
+    """
+    Generate feedback for a submitted report and mark it feedback_ready.
+    
+    Running it again for the same report is harmless: a report that is no
+    longer 'submitted' is left alone. If generation fails the report goes
+    back to draft so it can be submitted again.
+    """
+    report = Report.objects.only('case_id', 'content', 'status').get(pk=report_id)
+    if report.status != 'submitted':
+        return
+    
+    try:
+        feedback_content = FeedbackService.get_feedback(report.case_id, report.content)
+    except Exception:
+        logger.exception(f"Error generating feedback for report {report_id}")
+        Report.objects.filter(pk=report_id, status='submitted').update(
+            status='draft', last_modified=timezone.now()
+        )
+        raise
+    
+    with transaction.atomic():
+        if not Report.objects.filter(pk=report_id, status='submitted').update(
+            status='feedback_ready', last_modified=timezone.now()
+        ):
+            return
+        
+        # Create or replace the feedback
+        Feedback.objects.update_or_create(
+            report_id=report_id,
+            defaults={'content': feedback_content, 'flagged': False}
+        )
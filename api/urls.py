@@ -8,6 +8,7 @@ router.register(r'cases', views.CaseViewSet)
 router.register(r'reports', views.ReportViewSet, basename='report')
 router.register(r'series', views.DicomSeriesViewSet)
 router.register(r'images', views.DicomImageViewSet)
+router.register(r'dicom-jobs', views.DicomUploadJobViewSet)
 router.register(r'feedback', views.FeedbackViewSet, basename='feedback')
 
 urlpatterns = [
@@ -1,27 +1,97 @@
 # api/views.py
-from django.http import HttpResponse, FileResponse
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.parsers import MultiPartParser, FormParser
 import os
-import mimetypes
 import logging
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+from urllib.parse import quote
 
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, BasePermission, SAFE_METHODS
 
 
-from .models import Case, Report, DicomSeries, DicomImage, Feedback
+from .models import Case, Report, DicomSeries, DicomImage, DicomUploadJob, Feedback
 from .serializers import (
-    CaseSerializer, ReportSerializer, 
-    DicomSeriesSerializer, DicomSeriesDetailSerializer, DicomImageSerializer,
-    FeedbackSerializer
+    CaseSerializer, CaseListSerializer, ReportSerializer, ReportListSerializer,
+    DicomSeriesSerializer, DicomSeriesDetailSerializer,
+    DicomImageSerializer, DicomImageListSerializer, DICOM_IMAGE_LIST_FIELDS, DICOM_SERIES_FIELDS,
+    FeedbackSerializer, DicomUploadJobSerializer
 )
+from .cache import cache_response
+from .pagination import DicomImagePagination
+from .renderers import stream_json_array
 from .services.dicom_service import DicomService
+from .tasks import enqueue_dicom_upload, generate_report_feedback
 
 logger = logging.getLogger(__name__)
 
+# Case columns read by CaseListSerializer
+CASE_LIST_FIELDS = (
+    'id', 'title', 'description', 'modality', 'subspecialty', 'difficulty',
+    'dicom_path', 'creation_date', 'last_modified',
+)
+
+# Stored images are always <SOPInstanceUID>.dcm files
+DICOM_CONTENT_TYPE = 'application/dicom'
+
+# Bytes per read when Django itself streams a DICOM file
+FILE_RESPONSE_BLOCK_SIZE = 1024 * 1024
+
+# Stored DICOM files never change, so clients may keep them for a day
+DICOM_CACHE_MAX_AGE = 86400
+
+def _image_validators(request, pk):
+    """
+    Return (etag, last_modified) for an image's stored file, or (None, None)
+    if there is no such image or file. Looked up once per request and shared
+    by the @condition callbacks.
+    """
+    validators = getattr(request, '_image_validators', None)
+    if validators is None:
+        try:
+            file_path, sha1 = DicomImage.objects.values_list('file_path', 'sha1').get(pk=pk)
+            st = os.stat(file_path)
+        except (DicomImage.DoesNotExist, ValueError, OSError):
+            validators = (None, None)
+        else:
+            # Images stored before the sha1 column fall back to mtime and size
+            etag = f'"{sha1}"' if sha1 else f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+            validators = (etag, datetime.fromtimestamp(st.st_mtime, tz=dt_timezone.utc))
+        request._image_validators = validators
+    return validators
+
+def conditional_image_response(method):
+    """
+    Answer conditional GETs for an image endpoint with 304 Not Modified, and
+    let clients cache the response since stored images are write-once.
+    """
+    conditional = method_decorator(condition(
+        etag_func=lambda request, pk=None: _image_validators(request, pk)[0],
+        last_modified_func=lambda request, pk=None: _image_validators(request, pk)[1],
+    ))(method)
+    
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        response = conditional(self, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            patch_cache_control(response, private=True, max_age=DICOM_CACHE_MAX_AGE, immutable=True)
+        return response
+    return wrapper
+
+# Checked on every request, so a set rather than DRF's SAFE_METHODS tuple
+_SAFE_METHODS = frozenset(SAFE_METHODS)
+
 class IsAdminUserOrReadOnly(BasePermission):
     """
     The request is authenticated as an admin user, or is a read-only request.
@@ -29,7 +99,7 @@ class IsAdminUserOrReadOnly(BasePermission):
 
     def has_permission(self, request, view):
         return bool(
-            request.method in SAFE_METHODS or
+            request.method in _SAFE_METHODS or
             request.user and
             request.user.is_staff
         )
@@ -42,26 +112,47 @@ class CaseViewSet(viewsets.ModelViewSet):
     queryset = Case.objects.all().order_by('-creation_date')
     serializer_class = CaseSerializer
     permission_classes = [IsAuthenticated, IsAdminUserOrReadOnly]
-    """
-    API endpoint that allows Cases to be viewed or edited.
-    """
-    queryset = Case.objects.all().order_by('-creation_date')
-    serializer_class = CaseSerializer
+    throttle_scope = None  # Only upload_dicom is throttled
+    
+    def get_queryset(self):
+        """
+        Only load the columns CaseListSerializer needs when listing cases,
+        and only the key for actions that just need to find the case.
+        """
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.only(*CASE_LIST_FIELDS)
+        elif self.action in ('series', 'upload_dicom'):
+            queryset = queryset.only('id')
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CaseListSerializer
+        return CaseSerializer
+    
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
     
     @action(detail=True, methods=['get'])
+    @cache_response
     def series(self, request, pk=None):
         """
         Get all DICOM series for a specific case.
         """
         case = self.get_object()
-        series = case.series.all()
+        series = case.series.only(*DICOM_SERIES_FIELDS).annotate(_image_count=Count('images'))
         serializer = DicomSeriesSerializer(series, many=True, context={'request': request})
         return Response(serializer.data)
     
-    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser], throttle_scope='dicom_upload')
     def upload_dicom(self, request, pk=None):
         """
         Upload DICOM files for a case.
+        
+        The files are saved and processed in the background; the response is
+        a 202 with the DicomUploadJob to poll at /api/dicom-jobs/<id>/.
         """
         case = self.get_object()
         
@@ -73,19 +164,28 @@ class CaseViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Process the DICOM files
+        # Queue the DICOM files for processing
+        file_paths = []
         try:
-            stats = DicomService.process_dicom_files(case.id, files)
-            return Response(stats, status=status.HTTP_200_OK)
-        except ValueError as e:
+            file_paths = DicomService.save_incoming_files(files)
+            job = enqueue_dicom_upload(case.id, file_paths)
+            # Chunks that already ran (e.g. without a worker) update the job
+            job.refresh_from_db()
             return Response(
-                {'error': str(e)},
-                status=status.HTTP_400_BAD_REQUEST
+                DicomUploadJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Location': reverse('dicomuploadjob-detail', args=[job.id], request=request)}
             )
-        except Exception as e:
-            logger.exception("Error processing DICOM files")
+        except Exception:
+            logger.exception("Error queueing DICOM files")
+            # The job (if any) is marked failed; nothing will process the
+            # staged files either, so remove them
+            if file_paths:
+                upload_path = os.path.dirname(file_paths[0])
+                if os.path.exists(upload_path):
+                    DicomService.remove_directory(upload_path)
             return Response(
-                {'error': f'An error occurred while processing DICOM files: {str(e)}'},
+                {'error': 'An error occurred while queueing the DICOM files for processing.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
@@ -96,16 +196,35 @@ class ReportViewSet(viewsets.ModelViewSet):
     """
     serializer_class = ReportSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = None  # Only submit is throttled
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ReportListSerializer
+        return ReportSerializer
 
     def get_queryset(self):
         """
         This view should return a list of all the reports
-        for the currently authenticated user.
+        for the currently authenticated user, optionally for one case_id.
         """
         user = self.request.user
         if user.is_authenticated:
             # Filter reports by the logged-in user
-            return Report.objects.filter(author=user).order_by('-creation_date')
+            queryset = Report.objects.filter(author=user).order_by('-creation_date')
+            case_id = self.request.query_params.get('case_id')
+            if case_id:
+                queryset = queryset.filter(case_id=case_id)
+            if self.action == 'list':
+                # The list only shows the case title, so skip the large text columns
+                return queryset.select_related('case', 'author').defer(
+                    'content', 'case__description', 'case__teaching_points'
+                )
+            if self.action == 'submit':
+                # Submitting only needs to find the report
+                return queryset.only('id')
+            # Load the nested case, author and feedback in the same query
+            return queryset.select_related('case', 'author', 'feedback')
         # Return empty queryset if user is not authenticated
         return Report.objects.none()
 
@@ -115,68 +234,47 @@ class ReportViewSet(viewsets.ModelViewSet):
         """
         serializer.save()
         
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], throttle_scope='report_submit')
     def submit(self, request, pk=None):
         """
         Submit a report for feedback.
+        
+        Responds with a 202 and the submitted report; the feedback is
+        generated by the generate_report_feedback task.
         """
         report = self.get_object()
-        if report.status == 'draft':
-            report.status = 'submitted'
-            report.submission_date = timezone.now()
-            report.save()
-            
-            # Here you would typically call your LLM service to generate feedback
-            # For now, we'll create a placeholder feedback
-            try:
-                # Mock feedback generation - In a real implementation, you would call your LLM API
-                feedback_content = """
-                # Feedback on Your Report
-                
-                Thank you for submitting your diagnostic report. Here is some feedback to help you improve:
-                
-                ## Key Findings
-                Your report correctly identified most of the important findings. Good job on noting the primary pathology.
-                
-                ## Areas for Improvement
-                Consider including measurements of any abnormalities you observe. Also, be more specific in your description of location.
-                
-                ## Teaching Points
-                This case demonstrates classic features of the pathology. Remember that these findings often appear together and form a recognized pattern.
-                
-                ## Overall Assessment
-                This is a solid report with good structure. Continue to work on being comprehensive yet concise.
-                """
-                
-                # Create feedback
-                feedback, created = Feedback.objects.get_or_create(
-                    report=report,
-                    defaults={'content': feedback_content}
-                )
-                
-                if not created:
-                    # Update existing feedback
-                    feedback.content = feedback_content
-                    feedback.flagged = False
-                    feedback.save()
-                
-                report.status = 'feedback_ready'
-                report.save()
-                
-                return Response(
-                    ReportSerializer(report, context={'request': request}).data
-                )
-            except Exception as e:
-                # Log the error
-                logger.exception("Error generating feedback")
-                return Response(
-                    {"error": "Failed to generate feedback"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
         
+        # Only a draft can be submitted, even if two requests race; update()
+        # skips auto_now, so last_modified is set here
+        now = timezone.now()
+        if not Report.objects.filter(pk=report.pk, status='draft').update(
+            status='submitted', submission_date=now, last_modified=now
+        ):
+            return Response(
+                {"error": "Report is not in draft status"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Feedback is generated in the background; the client polls the
+        # report until its status is feedback_ready. The fixed task id lets
+        # the task for a report be looked up (or revoked) by report id.
+        try:
+            transaction.on_commit(lambda: generate_report_feedback.apply_async(
+                args=[str(report.pk)], task_id=f"feedback:{report.pk}"
+            ))
+        except Exception:
+            logger.exception("Error queueing feedback generation")
+            Report.objects.filter(pk=report.pk, status='submitted').update(status='draft')
+            return Response(
+                {"error": "Failed to generate feedback"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        # Without a worker the feedback is already there
+        report = Report.objects.select_related('case', 'author', 'feedback').get(pk=report.pk)
         return Response(
-            {"error": "Report is not in draft status"},
-            status=status.HTTP_400_BAD_REQUEST
+            ReportSerializer(report, context={'request': request}).data,
+            status=status.HTTP_202_ACCEPTED
         )
 
 class DicomSeriesViewSet(viewsets.ReadOnlyModelViewSet):
@@ -186,6 +284,8 @@ class DicomSeriesViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = DicomSeries.objects.all()
     serializer_class = DicomSeriesSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # The viewer lists every series of a case at once
+    pagination_class = None
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -196,21 +296,39 @@ class DicomSeriesViewSet(viewsets.ReadOnlyModelViewSet):
         """
         Filter series by case if case_id is provided.
         """
-        queryset = DicomSeries.objects.all()
+        if self.action == 'images':
+            # Only the key is needed to list the images, not the image count
+            return DicomSeries.objects.only('id')
+        
+        # Meta.ordering doesn't apply to the aggregate query, so order explicitly
+        queryset = DicomSeries.objects.only(*DICOM_SERIES_FIELDS).annotate(
+            _image_count=Count('images')
+        ).order_by('series_number', 'id')
         case_id = self.request.query_params.get('case_id')
         if case_id:
             queryset = queryset.filter(case_id=case_id)
         return queryset
 
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     @action(detail=True, methods=['get'])
     def images(self, request, pk=None):
         """
         Get all images for a specific series.
+        
+        A series can hold thousands of images, so the JSON array is streamed
+        as the rows are read instead of being built in memory (which is also
+        why this response isn't cached).
         """
         series = self.get_object()
-        images = series.images.all()
-        serializer = DicomImageSerializer(images, many=True, context={'request': request})
-        return Response(serializer.data)
+        images = series.images.only(*DICOM_IMAGE_LIST_FIELDS)
+        serializer = DicomImageListSerializer(context={'request': request})
+        return StreamingHttpResponse(
+            stream_json_array(images, serializer.to_representation),
+            content_type='application/json'
+        )
 
 class DicomImageViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -219,8 +337,26 @@ class DicomImageViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = DicomImage.objects.all()
     serializer_class = DicomImageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DicomImagePagination
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.only(*DICOM_IMAGE_LIST_FIELDS)
+        elif self.action == 'metadata':
+            queryset = queryset.only('id', 'metadata')
+        elif self.action == 'file':
+            queryset = queryset.only('id', 'file_path')
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return DicomImageListSerializer
+        return DicomImageSerializer
     
     @action(detail=True, methods=['get'])
+    @conditional_image_response
+    @cache_response
     def metadata(self, request, pk=None):
         """
         Get metadata for a specific image.
@@ -229,6 +365,7 @@ class DicomImageViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(image.metadata)
     
     @action(detail=True, methods=['get'])
+    @conditional_image_response
     def file(self, request, pk=None):
         """
         Download the DICOM file.
@@ -242,17 +379,27 @@ class DicomImageViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Try to determine the file's MIME type
-        content_type = mimetypes.guess_type(file_path)[0]
-        if content_type is None:
-            # Default MIME type for DICOM files
-            content_type = 'application/dicom'
-        
-        # Return file as response
-        response = FileResponse(open(file_path, 'rb'), content_type=content_type)
-        response['Content-Disposition'] = f'attachment; filename="{os.path.basename(file_path)}"'
+        filename = os.path.basename(file_path)
+        relative_path = os.path.relpath(file_path, settings.DICOM_STORAGE_PATH)
+        if settings.DICOM_ACCEL_REDIRECT_PREFIX and not relative_path.startswith(os.pardir):
+            # Let nginx send the file from its internal location
+            response = HttpResponse(content_type=DICOM_CONTENT_TYPE)
+            response['X-Accel-Redirect'] = settings.DICOM_ACCEL_REDIRECT_PREFIX + quote(relative_path)
+        else:
+            # Served through wsgi.file_wrapper (sendfile) where the server has one
+            response = FileResponse(open(file_path, 'rb'), content_type=DICOM_CONTENT_TYPE)
+            response.block_size = FILE_RESPONSE_BLOCK_SIZE
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
 
+class DicomUploadJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for polling the progress of background DICOM uploads.
+    """
+    queryset = DicomUploadJob.objects.all().order_by('-date_created')
+    serializer_class = DicomUploadJobSerializer
+    permission_classes = [IsAdminUser]
+
 class FeedbackViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for Feedback.
@@ -266,7 +413,11 @@ class FeedbackViewSet(viewsets.ReadOnlyModelViewSet):
         """
         user = self.request.user
         if user.is_authenticated:
-            return Feedback.objects.filter(report__author=user)
+            queryset = Feedback.objects.filter(report__author=user).order_by('-generated_date')
+            if self.action == 'flag':
+                # Flagging only needs to find the feedback
+                queryset = queryset.only('id')
+            return queryset
         return Feedback.objects.none()
     
     @action(detail=True, methods=['post'])
@@ -276,5 +427,5 @@ class FeedbackViewSet(viewsets.ReadOnlyModelViewSet):
         """
         feedback = self.get_object()
         feedback.flagged = True
-        feedback.save()
+        feedback.save(update_fields=['flagged'])
         return Response({'status': 'feedback flagged'})
\ No newline at end of file
@@ -0,0 +1,21 @@
+# backend/celery.py
+"""
+Celery application for background work (DICOM ingestion and the like).
+
+Start a worker for the DICOM queue with:
+    celery -A backend worker -Q dicom,celery -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+app = Celery('backend')
+
+# Read all CELERY_* settings from backend/settings.py
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Pick up tasks.py modules from installed apps
+app.autodiscover_tasks()
@@ -0,0 +1,42 @@
+# backend/log_handlers.py
+import atexit
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+
+class QueuedWatchedFileHandler(QueueHandler):
+    """
+    QueueHandler whose records are written to a WatchedFileHandler by a
+    background listener thread, so a logging call only puts the record on a
+    queue instead of writing to disk on the request thread.
+
+    Threads don't survive a fork, so a forked child (a Celery prefork worker,
+    gunicorn with --preload) starts a listener of its own on a fresh queue.
+    Those processes all append to the same file, so none of them rotates it:
+    leave that to logrotate (or similar). The file is reopened once it has
+    been moved away. The formatter configured in LOGGING is applied by the
+    QueueHandler before the record is queued.
+    """
+
+    def __init__(self, filename):
+        super().__init__(queue.SimpleQueue())
+        self.filename = filename
+        self._listener = None
+        self._start_listener()
+        os.register_at_fork(after_in_child=self._start_listener)
+        # Flush whatever is still queued when the process exits
+        atexit.register(self._stop_listener)
+
+    def _start_listener(self):
+        if self._listener is not None:
+            # Inherited from the parent: its thread is gone, and whatever was
+            # still queued is the parent's to write
+            self.queue = queue.SimpleQueue()
+        file_handler = WatchedFileHandler(self.filename, delay=True)
+        self._listener = QueueListener(self.queue, file_handler)
+        self._listener.start()
+
+    def _stop_listener(self):
+        self._listener.stop()
+        self._listener.handlers[0].close()
@@ -16,13 +16,29 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 DICOM_STORAGE_PATH = os.path.join(MEDIA_ROOT, 'dicom')
 
-# Make sure directories exist
-os.makedirs(MEDIA_ROOT, exist_ok=True)
-os.makedirs(DICOM_STORAGE_PATH, exist_ok=True)
+# Spool every upload to a temporary file instead of keeping small ones in
+# memory; DicomService moves the temporary files into its incoming area, so
+# a large study never sits in the worker's memory. Set FILE_UPLOAD_TEMP_DIR
+# to a directory on the same filesystem as MEDIA_ROOT to make that a rename.
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
+# Rows per INSERT when bulk-creating DICOM series and images
+DICOM_BULK_BATCH_SIZE = int(os.environ.get('DICOM_BULK_BATCH', '500'))
+
+# Files per background task when processing a DICOM upload
+DICOM_UPLOAD_CHUNK_SIZE = int(os.environ.get('DICOM_UPLOAD_CHUNK', '100'))
+
+# Behind nginx, set this to an internal location aliasing DICOM_STORAGE_PATH
+# so DICOM downloads are sent by nginx instead of Django, e.g.
+#   location /protected/dicom/ { internal; alias /path/to/media/dicom/; }
+# with DICOM_ACCEL_REDIRECT=/protected/dicom/
+DICOM_ACCEL_REDIRECT_PREFIX = os.environ.get('DICOM_ACCEL_REDIRECT', '')
 
 SECRET_KEY = 'django-insecure-t=5j%*t=&kz&eki)w=$x*u%+*!-qvu%x2q(5o%2!azm!zqt&94' # Keep your actual secret key
-DEBUG = True
-ALLOWED_HOSTS = []
+# Set DJANGO_DEBUG=1 for development; without it DEBUG is off, which also
+# drops the request-logging middleware and the per-request query log
+DEBUG = os.environ.get('DJANGO_DEBUG') == '1'
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1,[::1]').split(',')
 
 
 # Application definition
@@ -62,6 +78,10 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
 ]
 
+if DEBUG:
+    # Logs every API request and response; right after the CORS middleware
+    MIDDLEWARE.insert(2, 'api.debug_middleware.DebugRequestMiddleware')
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -83,12 +103,36 @@ TEMPLATES = [
 WSGI_APPLICATION = 'backend.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite locks the whole file for every write, so set POSTGRES_DB (and the
+# other POSTGRES_* variables) to use PostgreSQL for anything beyond a single
+# user. Connections are kept open between requests; behind PgBouncer in
+# transaction pooling mode also set POSTGRES_PGBOUNCER=1.
+if os.environ.get('POSTGRES_DB'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ['POSTGRES_DB'],
+            'USER': os.environ.get('POSTGRES_USER', ''),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', ''),
+            'PORT': os.environ.get('POSTGRES_PORT', ''),
+            'CONN_MAX_AGE': int(os.environ.get('POSTGRES_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            # PgBouncer's transaction pooling can't keep a cursor open
+            # across transactions
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('POSTGRES_PGBOUNCER') == '1',
+            'OPTIONS': {
+                'sslmode': os.environ.get('POSTGRES_SSLMODE', 'prefer'),
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
     }
-}
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -114,11 +158,35 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # --- Django REST Framework Configuration ---
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication with the token and user cached for a minute
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ]
+    ],
+    # JSON is encoded and decoded with orjson (see api/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # List endpoints return {count, next, previous, results} pages
+    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'PAGE_SIZE': 50,
+    # Only views/actions with a throttle_scope are throttled. The counters
+    # live in the default cache, so set REDIS_URL to share them between
+    # worker processes.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'rest_framework.throttling.ScopedRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'dicom_upload': '10/min',
+        'report_submit': '20/hour',
+    },
 }
 # --- End Django REST Framework Configuration ---
 
@@ -144,21 +212,44 @@ CORS_ALLOW_CREDENTIALS = True
 
 # --- End CORS Configuration ---
 
-# Add this to your backend/settings.py file:
+# --- Celery Configuration ---
+# Without a broker configured, tasks run inline in the calling process so the
+# dev server works without a worker. Set CELERY_BROKER_URL (e.g.
+# redis://localhost:6379/0) and run `celery -A backend worker` to offload them.
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', '')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND') or None
+CELERY_TASK_ALWAYS_EAGER = not CELERY_BROKER_URL
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_RESULT_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
 
-# Add the debug middleware to your MIDDLEWARE list
-MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'corsheaders.middleware.CorsMiddleware',  # Keep this high in the list
-    'api.debug_middleware.DebugRequestMiddleware',  # Add this line
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'allauth.account.middleware.AccountMiddleware',
-]
+# DICOM ingestion is disk/CPU heavy, so it gets its own queue and workers
+CELERY_TASK_ROUTES = {
+    'api.tasks.process_dicom_zip': {'queue': 'dicom'},
+    'api.tasks.process_dicom_chunk': {'queue': 'dicom'},
+    'api.tasks.delete_dicom_directory': {'queue': 'dicom'},
+}
+# --- End Celery Configuration ---
+
+# --- Cache Configuration ---
+# Read-only case/series responses are cached (see api/cache.py). Set REDIS_URL
+# (e.g. redis://localhost:6379/1) to share the cache between processes;
+# otherwise each process keeps its own in-memory cache.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# --- End Cache Configuration ---
 
 # Add more detailed logging
 LOGGING = {
@@ -177,9 +268,14 @@ LOGGING = {
             'formatter': 'verbose',
         },
         'file': {
+            # Written by a background thread; see backend/log_handlers.py.
+            # Every worker process appends to this file, so it isn't rotated
+            # here; rotate it with logrotate, which is picked up on the next
+            # record.
             'level': 'DEBUG',
-            'class': 'logging.FileHandler',
-            'filename': 'debug.log',
+            '()': 'backend.log_handlers.QueuedWatchedFileHandler',
+            # Opened on the first record, not when the settings are loaded
+            'filename': os.environ.get('DJANGO_LOG_FILE', 'debug.log'),
             'formatter': 'verbose',
         },
     },
@@ -191,7 +287,7 @@ LOGGING = {
         },
         'api': {
             'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'level': 'DEBUG' if DEBUG else 'INFO',
             'propagate': True,
         },
     },
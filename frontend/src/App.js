@@ -39,6 +39,9 @@ async function apiCall(endpoint, method = 'GET', data = null, token = null) {
   } catch (error) { console.error(`API call failed for ${method} ${endpoint}:`, error); throw error; }
 }
 
+// List endpoints are paginated; turn a page's `next` URL back into an apiCall endpoint
+const pageEndpoint = (url) => url ? url.slice(url.indexOf('/api/') + 4) : null;
+
 // --- Authentication Component ---
 function LoginRegister({ setAuthToken, navigate }) {
   const [isLogin, setIsLogin] = useState(true);
@@ -95,6 +98,8 @@ function LoginRegister({ setAuthToken, navigate }) {
 // --- Dashboard Component ---
 function Dashboard({ authToken, setAuthToken, navigate }) {
   const [cases, setCases] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -103,8 +108,8 @@ function Dashboard({ authToken, setAuthToken, navigate }) {
       setLoading(true); setError(null);
       apiCall('/cases/', 'GET', null, authToken)
         .then(data => {
-          if (Array.isArray(data)) { setCases(data); }
-          else { console.error("API did not return an array for cases:", data); setCases([]); setError("Received invalid data format."); }
+          if (data && Array.isArray(data.results)) { setCases(data.results); setNextPage(pageEndpoint(data.next)); }
+          else { console.error("API did not return a page of cases:", data); setCases([]); setError("Received invalid data format."); }
           setLoading(false);
         })
         .catch(err => { console.error("Failed to fetch cases:", err); setError(err.message || "Failed to load cases."); setLoading(false); });
@@ -119,6 +124,16 @@ function Dashboard({ authToken, setAuthToken, navigate }) {
 
   const handleOpenCase = (caseId) => { navigate('workstation', { caseId: caseId }); };
 
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await apiCall(nextPage, 'GET', null, authToken);
+      setCases(currentCases => [...currentCases, ...data.results]);
+      setNextPage(pageEndpoint(data.next));
+    } catch (err) { console.error("Failed to fetch more cases:", err); setError(err.message || "Failed to load cases."); }
+    finally { setLoadingMore(false); }
+  };
+
   return (
     <div className="min-h-screen bg-gradient-to-br from-gray-50 via-blue-50 to-indigo-100 font-sans">
       <header className="bg-white shadow-sm sticky top-0 z-10 border-b border-gray-200">
@@ -134,7 +149,7 @@ function Dashboard({ authToken, setAuthToken, navigate }) {
           <h2 className="text-3xl font-bold text-gray-800 mb-6">Available Cases</h2>
           {loading && <p className="text-center text-gray-600 py-10 text-lg">Loading cases...</p>}
           {error && <div className="bg-red-100 border-l-4 border-red-500 text-red-700 p-4 rounded-md shadow" role="alert"><p className="font-bold">Error</p><p>{error}</p></div>}
-          {!loading && !error && ( <> {cases.length === 0 ? ( <div className="text-center text-gray-500 py-10 bg-white rounded-lg shadow">No cases available yet. Add some via the Django Admin!</div> ) : ( <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8"> {cases.map(caseItem => ( <div key={caseItem.id} className="bg-white rounded-lg shadow-md overflow-hidden transition duration-300 ease-in-out hover:shadow-xl flex flex-col border border-gray-200"> <div className="p-6 flex-grow"><h3 className="text-xl font-semibold text-indigo-700 mb-3">{caseItem.title}</h3><div className="flex flex-wrap gap-x-3 gap-y-2 text-xs mb-4"><span className="inline-flex items-center px-3 py-1 rounded-full bg-blue-100 text-blue-800 font-medium">{caseItem.modality_display || caseItem.modality}</span><span className="inline-flex items-center px-3 py-1 rounded-full bg-green-100 text-green-800 font-medium">{caseItem.subspecialty_display || caseItem.subspecialty}</span><span className={`inline-flex items-center px-3 py-1 rounded-full font-medium ${ caseItem.difficulty === 'easy' ? 'bg-yellow-100 text-yellow-800' : caseItem.difficulty === 'medium' ? 'bg-orange-100 text-orange-800' : 'bg-red-100 text-red-800' }`}>{caseItem.difficulty_display || caseItem.difficulty}</span></div><p className="text-gray-600 text-sm mb-4 line-clamp-3">{caseItem.description}</p></div><div className="bg-gray-50 px-6 py-4 border-t border-gray-200"><button onClick={() => handleOpenCase(caseItem.id)} className="w-full px-4 py-2 text-sm font-medium text-white bg-indigo-600 rounded-lg shadow-sm hover:bg-indigo-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500 transition duration-150 ease-in-out">Open Case</button></div></div> ))} </div> )} </> )}
+          {!loading && !error && ( <> {cases.length === 0 ? ( <div className="text-center text-gray-500 py-10 bg-white rounded-lg shadow">No cases available yet. Add some via the Django Admin!</div> ) : ( <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8"> {cases.map(caseItem => ( <div key={caseItem.id} className="bg-white rounded-lg shadow-md overflow-hidden transition duration-300 ease-in-out hover:shadow-xl flex flex-col border border-gray-200"> <div className="p-6 flex-grow"><h3 className="text-xl font-semibold text-indigo-700 mb-3">{caseItem.title}</h3><div className="flex flex-wrap gap-x-3 gap-y-2 text-xs mb-4"><span className="inline-flex items-center px-3 py-1 rounded-full bg-blue-100 text-blue-800 font-medium">{caseItem.modality_display || caseItem.modality}</span><span className="inline-flex items-center px-3 py-1 rounded-full bg-green-100 text-green-800 font-medium">{caseItem.subspecialty_display || caseItem.subspecialty}</span><span className={`inline-flex items-center px-3 py-1 rounded-full font-medium ${ caseItem.difficulty === 'easy' ? 'bg-yellow-100 text-yellow-800' : caseItem.difficulty === 'medium' ? 'bg-orange-100 text-orange-800' : 'bg-red-100 text-red-800' }`}>{caseItem.difficulty_display || caseItem.difficulty}</span></div><p className="text-gray-600 text-sm mb-4 line-clamp-3">{caseItem.description}</p></div><div className="bg-gray-50 px-6 py-4 border-t border-gray-200"><button onClick={() => handleOpenCase(caseItem.id)} className="w-full px-4 py-2 text-sm font-medium text-white bg-indigo-600 rounded-lg shadow-sm hover:bg-indigo-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-indigo-500 transition duration-150 ease-in-out">Open Case</button></div></div> ))} </div> )} {nextPage && ( <div className="text-center mt-8"><button onClick={handleLoadMore} disabled={loadingMore} className="px-6 py-2 text-sm font-medium text-indigo-700 bg-white border border-indigo-300 rounded-lg shadow-sm hover:bg-indigo-50 disabled:opacity-50 transition duration-150 ease-in-out">{loadingMore ? 'Loading...' : 'Load More Cases'}</button></div> )} </> )}
         </div>
       </main>
     </div>
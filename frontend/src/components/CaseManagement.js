@@ -2,6 +2,7 @@
 import React, { useState, useEffect } from 'react';
 import DicomUploader from './DicomUploader';
 import DicomFilesList from './DicomFilesList';
+import { waitForUploadJob } from '../utils/dicomUploadJob';
 
 const apiCall = async (endpoint, method = 'GET', data = null, token = null) => {
   const API_BASE_URL = 'http://127.0.0.1:8000/api';
@@ -39,6 +40,9 @@ const apiCall = async (endpoint, method = 'GET', data = null, token = null) => {
   }
 };
 
+// List endpoints are paginated; turn a page's `next` URL back into an apiCall endpoint
+const pageEndpoint = (url) => url ? url.slice(url.indexOf('/api/') + 4) : null;
+
 const CaseManagement = ({ authToken, navigate }) => {
   const [cases, setCases] = useState([]);
   const [loading, setLoading] = useState(false);
@@ -99,8 +103,15 @@ const CaseManagement = ({ authToken, navigate }) => {
     setError(null);
     
     try {
-      const data = await apiCall('/cases/', 'GET', null, authToken);
-      setCases(data);
+      // Case management lists every case, so follow the pages to the end
+      const allCases = [];
+      let endpoint = '/cases/';
+      while (endpoint) {
+        const data = await apiCall(endpoint, 'GET', null, authToken);
+        allCases.push(...data.results);
+        endpoint = pageEndpoint(data.next);
+      }
+      setCases(allCases);
     } catch (err) {
       setError(err.message || 'Failed to load cases');
     } finally {
@@ -142,9 +153,14 @@ const CaseManagement = ({ authToken, navigate }) => {
       
       const newCase = await apiCall('/cases/', 'POST', caseData, authToken);
       
-      // Then, if there are DICOM files, upload them
+      // Then, if there are DICOM files, upload them and wait until they're processed
       if (dicomFiles.length > 0) {
-        await uploadDicomFiles(newCase.id);
+        try {
+          await uploadDicomFiles(newCase.id);
+        } catch (err) {
+          fetchCases(); // The case itself was created
+          throw new Error(`Case created, but the DICOM upload failed: ${err.message}`);
+        }
       }
       
       setCreateSuccess(true);
@@ -184,7 +200,8 @@ const CaseManagement = ({ authToken, navigate }) => {
       return new Promise((resolve, reject) => {
         xhr.onload = () => {
           if (xhr.status >= 200 && xhr.status < 300) {
-            resolve(JSON.parse(xhr.responseText));
+            // The response is the upload job; settle once it has finished
+            waitForUploadJob(JSON.parse(xhr.responseText), authToken).then(resolve, reject);
           } else {
             let errorMsg = 'Upload failed';
             try {
@@ -382,7 +399,9 @@ const CaseManagement = ({ authToken, navigate }) => {
                             style={{ width: `${uploadProgress}%` }}
                           ></div>
                         </div>
-                        <p className="text-xs text-gray-500 mt-1">Uploading: {uploadProgress}%</p>
+                        <p className="text-xs text-gray-500 mt-1">
+                          {uploadProgress < 100 ? `Uploading: ${uploadProgress}%` : 'Processing DICOM files...'}
+                        </p>
                       </div>
                     )}
                   </div>
@@ -1,5 +1,6 @@
 // frontend/src/components/DicomUploader.js
 import React, { useState } from 'react';
+import { waitForUploadJob } from '../utils/dicomUploadJob';
 
 const DicomUploader = ({ caseId, authToken, onComplete }) => {
   const [dicomFiles, setDicomFiles] = useState([]);
@@ -12,6 +13,24 @@ const DicomUploader = ({ caseId, authToken, onComplete }) => {
     setDicomFiles(Array.from(e.target.files));
   };
   
+  // Uploads are processed in the background; wait for the job to finish
+  const pollUploadJob = async (job) => {
+    try {
+      const completedJob = await waitForUploadJob(job, authToken);
+      setSuccess(true);
+      console.log('Upload successful:', completedJob);
+      
+      // Call the onComplete callback if provided
+      if (onComplete && typeof onComplete === 'function') {
+        onComplete(completedJob);
+      }
+    } catch (err) {
+      setError(err.message || 'Could not check the upload status');
+    } finally {
+      setUploading(false);
+    }
+  };
+  
   const handleUpload = async () => {
     if (dicomFiles.length === 0) {
       setError('Please select at least one DICOM file to upload.');
@@ -42,14 +61,8 @@ const DicomUploader = ({ caseId, authToken, onComplete }) => {
       }; 
       xhr.onload = () => {
         if (xhr.status >= 200 && xhr.status < 300) {
-          setSuccess(true);
-          const result = JSON.parse(xhr.responseText);
-          console.log('Upload successful:', result);
-          
-          // Call the onComplete callback if provided
-          if (onComplete && typeof onComplete === 'function') {
-            onComplete(result);
-          }
+          pollUploadJob(JSON.parse(xhr.responseText));
+          return;
         } else {
           let errorMsg = 'Upload failed';
           try {
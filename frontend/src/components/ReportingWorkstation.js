@@ -36,26 +36,31 @@ const ReportingWorkstation = ({ authToken, navigate, params }) => {
           setCaseDetails(data);
           
           // Check if user has an existing report for this case
-          return debugApiCall('/reports/', 'GET', null, authToken);
+          return debugApiCall(`/reports/?case_id=${caseId}`, 'GET', null, authToken);
         })
         .then(reports => {
           console.log("User reports received: ", reports);
           
           // Find a report for this case
-          const existingReport = reports.find(r => r.case_id === parseInt(caseId));
+          const existingReport = reports.results.find(r => r.case_id === parseInt(caseId));
           console.log("Existing report for this case: ", existingReport);
           
           if (existingReport) {
-            setReportContent(existingReport.content || '');
-            setLanguage(existingReport.language || 'en');
-            setReportId(existingReport.id);
-            setReportStatus(existingReport.status || 'draft');
-            setLastSaved(new Date(existingReport.last_modified));
-            
-            // If report has feedback, navigate to feedback page
-            if (existingReport.status === 'feedback_ready' && existingReport.feedback) {
-              navigate('feedback', { reportId: existingReport.id });
-            }
+            // The list only carries a summary, so load the full report
+            return debugApiCall(`/reports/${existingReport.id}/`, 'GET', null, authToken)
+              .then(report => {
+                setReportContent(report.content || '');
+                setLanguage(report.language || 'en');
+                setReportId(report.id);
+                setReportStatus(report.status || 'draft');
+                setLastSaved(new Date(report.last_modified));
+                
+                // If report has feedback, navigate to feedback page
+                if (report.status === 'feedback_ready' && report.feedback) {
+                  navigate('feedback', { reportId: report.id });
+                }
+                return null;
+              });
           } else {
             // Create a new draft report with DETAILED DEBUG LOGGING
             const newReportData = {
@@ -129,6 +134,29 @@ const ReportingWorkstation = ({ authToken, navigate, params }) => {
     }
   };
 
+  // Feedback is generated in the background, so poll the report until it's ready
+  const pollReportFeedback = (report) => {
+    if (report.status === 'feedback_ready') {
+      navigate('feedback', { reportId: report.id });
+      return;
+    }
+    if (report.status === 'draft') {
+      // Generation failed and the report was handed back for resubmission
+      setReportStatus('draft');
+      setSubmitSuccess(null);
+      setSubmitError('Feedback could not be generated. Please submit the report again.');
+      return;
+    }
+    
+    setTimeout(async () => {
+      try {
+        pollReportFeedback(await debugApiCall(`/reports/${report.id}/`, 'GET', null, authToken));
+      } catch (err) {
+        setSubmitError(err.message || 'Could not check the feedback status');
+      }
+    }, 2000);
+  };
+
   // Report submission logic
   const handleReportSubmit = async (event) => {
     event.preventDefault();
@@ -147,10 +175,8 @@ const ReportingWorkstation = ({ authToken, navigate, params }) => {
       setSubmitSuccess("Report submitted successfully! Generating feedback...");
       setReportStatus('submitted');
       
-      // If feedback is already ready, navigate to feedback page
-      if (data.status === 'feedback_ready') {
-        navigate('feedback', { reportId: reportId });
-      }
+      // Navigate to the feedback page once the feedback is ready
+      pollReportFeedback(data);
     } catch (err) {
       let errorMessage = `Failed to submit report.`;
       if (err.data) {
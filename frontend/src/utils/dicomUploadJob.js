@@ -0,0 +1,27 @@
+// frontend/src/utils/dicomUploadJob.js
+
+// How often a DICOM upload job is checked while its files are processed
+const POLL_INTERVAL_MS = 2000;
+
+/**
+ * Uploads are processed in the background; poll the DicomUploadJob returned
+ * by upload_dicom until it finishes. Resolves with the completed job and
+ * rejects if processing failed or the job could not be checked.
+ */
+export const waitForUploadJob = async (job, token) => {
+  while (job.status !== 'completed' && job.status !== 'failed') {
+    await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+    const response = await fetch(`http://127.0.0.1:8000/api/dicom-jobs/${job.id}/`, {
+      headers: { 'Authorization': `Token ${token}` }
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    job = await response.json();
+  }
+
+  if (job.status === 'failed') {
+    throw new Error(job.error || 'Processing the DICOM files failed');
+  }
+  return job;
+};